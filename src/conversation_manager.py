@@ -6,10 +6,8 @@ import json
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
-from .calendar import GoogleCalendarProvider
 from .storage import ConversationStorage
 from .openai_client import OpenAIClient, ModelResponse, ToolRequest
-from .tasks import TaskManager
 from .config import (
     CALENDAR_TOOLS,
     ENABLE_CALENDAR,
@@ -30,8 +28,18 @@ class ConversationManager:
         self.api_client = OpenAIClient()
         self.enable_calendar = ENABLE_CALENDAR
         self.enable_tasks = ENABLE_TASKS
-        self.calendar = GoogleCalendarProvider() if self.enable_calendar else None
-        self.task_manager = TaskManager() if self.enable_tasks else None
+        self.calendar = None
+        self.task_manager = None
+        # Feature subsystems are imported on demand so a disabled feature
+        # never pays for its dependencies (google-api-python-client etc.).
+        if self.enable_calendar:
+            from .calendar import GoogleCalendarProvider
+
+            self.calendar = GoogleCalendarProvider()
+        if self.enable_tasks:
+            from .tasks import TaskManager
+
+            self.task_manager = TaskManager()
         self.max_tool_iterations = 3
         self.tool_handlers: Dict[str, Any] = {}
         self.disabled_tool_messages: Dict[str, str] = {}
@@ -119,7 +127,8 @@ class ConversationManager:
                 "Tool configuration mismatch detected. " + " ".join(problems)
             )
 
-    def validate_message(self, message: str):
+    @staticmethod
+    def validate_message(message: str):
         """Validate message length"""
         if not message or not message.strip():
             return False, "Message cannot be empty"
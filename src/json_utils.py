@@ -0,0 +1,51 @@
+"""
+JSON file helpers shared by the storage backends
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+try:
+    # Optional Rust encoder; several times faster than the json module and
+    # returns bytes directly.
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(data: Any) -> bytes:
+    """Serialize data to indented UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def dumps_line(data: Any) -> bytes:
+    """Serialize data to one compact UTF-8 JSON line, newline included"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return (
+        json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+    ).encode("utf-8")
+
+
+def loads(raw: bytes) -> Any:
+    """Parse one JSON document from bytes"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def load_json(path: Path) -> Any:
+    """Read and parse a JSON file in one read.
+
+    Raises FileNotFoundError or json.JSONDecodeError (orjson's error type
+    subclasses it) so callers keep a single except clause.
+    """
+    return loads(path.read_bytes())
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Encode data up front and hand the file a single buffer"""
+    path.write_bytes(dumps_bytes(data))
@@ -7,8 +7,6 @@ from dataclasses import dataclass
 from time import perf_counter
 from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
-
 from .api_logger import api_logger
 from .config import (
     CALENDAR_TOOLS,
@@ -44,6 +42,9 @@ class OpenAIClient:
             raise ValueError(
                 "OPENAI_API_KEY is not set. Please check your .env file or environment variables."
             )
+        # Imported here so importing this module doesn't load the SDK.
+        from openai import OpenAI
+
         self.client = OpenAI(api_key=OPENAI_API_KEY)
         self.model = OPENAI_MODEL
         self.temperature = OPENAI_TEMPERATURE
@@ -3,20 +3,36 @@ Conversation storage handler - manages persistence in JSON format
 """
 
 import json
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import quote
 from .config import STORAGE_FILE, SYSTEM_PROMPT
+from .json_utils import dumps_line, load_json, loads, write_json
 
 
 class ConversationStorage:
-    """Handles conversation persistence in JSON format"""
+    """Handles conversation persistence in JSON format
+
+    mode="json" keeps every session in one JSON document. mode="jsonl" keeps
+    one JSON Lines file per session (a header line, then one line per
+    message) in a directory named after storage_file, so add_message appends
+    a single line instead of rewriting all history.
+    """
     
-    def __init__(self, storage_file=STORAGE_FILE):
+    def __init__(self, storage_file=STORAGE_FILE, mode="json"):
+        if mode not in ("json", "jsonl"):
+            raise ValueError(f"Unsupported storage mode: {mode}")
         self.storage_file = storage_file
+        self.mode = mode
+        self._buffer = None
         self.ensure_storage_file()
     
     def ensure_storage_file(self):
         """Create storage file if it doesn't exist"""
+        if self.mode == "jsonl":
+            self._session_dir().mkdir(parents=True, exist_ok=True)
+            return
         storage_path = Path(self.storage_file)
         storage_path.parent.mkdir(parents=True, exist_ok=True)
         if not storage_path.exists():
@@ -24,21 +40,64 @@ class ConversationStorage:
     
     def load_conversations(self):
         """Load all conversations from JSON file"""
+        if self._buffer is not None:
+            return self._buffer
+        if self.mode == "jsonl":
+            sessions = (
+                self._read_session(path)
+                for path in sorted(self._session_dir().glob("*.jsonl"))
+            )
+            return {"conversations": [conv for conv in sessions if conv is not None]}
         try:
-            with open(self.storage_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(Path(self.storage_file))
         except (FileNotFoundError, json.JSONDecodeError):
             return {"conversations": []}
     
     def save_conversations(self, data):
         """Save conversations to JSON file"""
+        if self._buffer is not None:
+            self._buffer = data
+            return
+        if self.mode == "jsonl":
+            for conv in data["conversations"]:
+                self._write_session(conv)
+            return
         storage_path = Path(self.storage_file)
         storage_path.parent.mkdir(parents=True, exist_ok=True)
-        with storage_path.open('w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(storage_path, data)
+    
+    @contextmanager
+    def buffered(self):
+        """Keep loads and saves in memory, writing the file once on exit"""
+        if self._buffer is not None or self.mode == "jsonl":
+            # Already buffering (the outermost block does the write), or in
+            # JSONL mode where every append is already a single write.
+            yield self
+            return
+        self._buffer = self.load_conversations()
+        try:
+            yield self
+        finally:
+            data, self._buffer = self._buffer, None
+            self.save_conversations(data)
+    
+    def get_session(self, session_id):
+        """Return an existing session, or None; never writes"""
+        if self.mode == "jsonl":
+            try:
+                return self._read_session(self._session_path(session_id))
+            except FileNotFoundError:
+                return None
+        data = self.load_conversations()
+        return next(
+            (conv for conv in data["conversations"] if conv["session_id"] == session_id),
+            None,
+        )
     
     def get_or_create_session(self, session_id):
         """Get existing session or create new one"""
+        if self.mode == "jsonl":
+            return self._get_or_create_jsonl_session(session_id)
         data = self.load_conversations()
         
         # Find existing session
@@ -58,11 +117,15 @@ class ConversationStorage:
     
     def add_message(self, session_id, role, content, **extra_fields):
         """Add a message to a conversation session"""
-        data = self.load_conversations()
         message = {"role": role, "content": content}
         if extra_fields:
             message.update(extra_fields)
         
+        if self.mode == "jsonl":
+            self._append_jsonl_message(session_id, message)
+            return
+        
+        data = self.load_conversations()
         for conv in data["conversations"]:
             if conv["session_id"] == session_id:
                 conv["messages"].append(message)
@@ -81,4 +144,86 @@ class ConversationStorage:
         }
         data["conversations"].append(new_session)
         self.save_conversations(data)
+    
+    def _session_dir(self):
+        # conversations.json -> conversations/
+        return Path(self.storage_file).with_suffix("")
+    
+    def _session_path(self, session_id):
+        # Quote everything so ids containing "/" or ".." stay in the directory.
+        return self._session_dir() / f"{quote(session_id, safe='')}.jsonl"
+    
+    def _read_session(self, path):
+        """Rebuild a session dict from its header line and message lines
 
+        Returns None for an empty file or unreadable header. Undecodable
+        message lines are torn appends (later appends start on a fresh line
+        after them) and are skipped.
+        """
+        header, *lines = path.read_bytes().splitlines() or [b""]
+        try:
+            session = loads(header)
+        except json.JSONDecodeError:
+            return None
+        messages = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                messages.append(loads(line))
+            except json.JSONDecodeError:
+                continue
+        session["messages"] = messages
+        return session
+    
+    def _write_session(self, session):
+        header = {key: value for key, value in session.items() if key != "messages"}
+        lines = [dumps_line(header)]
+        lines.extend(dumps_line(message) for message in session["messages"])
+        path = self._session_path(session["session_id"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"".join(lines))
+    
+    def _read_header(self, path):
+        # Only the first line, so appends stay cheap on long sessions.
+        with path.open("rb") as f:
+            try:
+                return loads(f.readline())
+            except json.JSONDecodeError:
+                return None
+    
+    def _get_or_create_jsonl_session(self, session_id):
+        path = self._session_path(session_id)
+        try:
+            session = self._read_session(path)
+        except FileNotFoundError:
+            session = None
+        else:
+            if session is None and path.stat().st_size:
+                # Unreadable header (e.g. a torn rewrite): keep the file for
+                # recovery instead of overwriting the messages in it.
+                stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+                path.replace(path.with_name(f"{path.name}.{stamp}.corrupt"))
+        if session is not None:
+            return session
+        new_session = {
+            "session_id": session_id,
+            "messages": [{"role": "system", "content": SYSTEM_PROMPT}],
+            "created_at": datetime.now().isoformat()
+        }
+        self._write_session(new_session)
+        return new_session
+    
+    def _append_jsonl_message(self, session_id, message):
+        path = self._session_path(session_id)
+        try:
+            header = self._read_header(path)
+        except FileNotFoundError:
+            header = None
+        if header is None:
+            self._get_or_create_jsonl_session(session_id)
+        with path.open("ab+") as f:
+            f.seek(-1, 2)
+            # Terminate a torn last line so this message stays on its own.
+            prefix = b"" if f.read(1) == b"\n" else b"\n"
+            f.write(prefix + dumps_line(message))
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Dict, List
 
 from ..config import TASKS_FILE
+from ..json_utils import load_json, write_json
 
 
 class TaskStorage:
@@ -25,15 +26,13 @@ class TaskStorage:
 
     def load_tasks(self) -> Dict[str, List[Dict]]:
         try:
-            with self.storage_file.open("r", encoding="utf-8") as handle:
-                return json.load(handle)
+            return load_json(self.storage_file)
         except (FileNotFoundError, json.JSONDecodeError):
             return {"tasks": []}
 
     def save_tasks(self, data: Dict[str, List[Dict]]) -> None:
         self.storage_file.parent.mkdir(parents=True, exist_ok=True)
-        with self.storage_file.open("w", encoding="utf-8") as handle:
-            json.dump(data, handle, indent=2, ensure_ascii=False)
+        write_json(self.storage_file, data)
 
     def get_tasks(self) -> List[Dict]:
         data = self.load_tasks()
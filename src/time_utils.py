@@ -5,20 +5,50 @@ Helpers for working with local time references and relative phrases.
 from __future__ import annotations
 
 import re
+import sys
 from dataclasses import dataclass
-from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from datetime import date, datetime, time, timedelta, timezone
+from time import monotonic
 from typing import Optional
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from .config import CLIENT_TIMEZONE
 
+try:
+    # Optional C parser; several times faster than datetime.fromisoformat.
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+    _parse_iso_datetime = None
 
 try:
-    LOCAL_ZONE = ZoneInfo(CLIENT_TIMEZONE)
-except ZoneInfoNotFoundError:
-    # Fallback to UTC+2 if tzdata is not available in the environment.
-    LOCAL_ZONE = timezone(timedelta(hours=2))
+    # Optional linear-time (DFA) regex engine for scanning long inputs.
+    import re2
+except ImportError:
+    re2 = None
+
+
+@lru_cache(maxsize=1)
+def _local_zone():
+    # Resolved on first use so importing this module skips tzdata discovery.
+    try:
+        return ZoneInfo(CLIENT_TIMEZONE)
+    except ZoneInfoNotFoundError:
+        # Fallback to UTC+2 if tzdata is not available in the environment.
+        return timezone(timedelta(hours=2))
+
+
+def __getattr__(name: str):
+    # Keep LOCAL_ZONE importable without resolving it at import time.
+    if name == "LOCAL_ZONE":
+        return _local_zone()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 LATE_HOUR_THRESHOLD = 21
+HUMAN_FORMAT = "%A, %d %B %Y, %H:%M"
+_DEFAULT_TIME = time(9, 0)
+_TONIGHT_TIME = time(20, 0)
 
 RELATIVE_KEYWORDS = (
     ("day after tomorrow", 2),
@@ -28,11 +58,26 @@ RELATIVE_KEYWORDS = (
 )
 
 TIME_PATTERN = re.compile(
-    r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>am|pm)?", re.IGNORECASE
+    r"(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<ampm>am|pm)?",
+    re.IGNORECASE | re.ASCII,
+)
+_time_search = (
+    re2.compile("(?i)" + TIME_PATTERN.pattern).search
+    if re2 is not None
+    else TIME_PATTERN.search
+)
+# Cheap prescreen: most phrases carry no digits and cannot contain a time.
+_DIGIT_RE = re.compile(r"\d", re.ASCII)
+# ciso8601 also accepts partial ("2025-11") and ordinal dates, hour 24 and a
+# lowercase "z" suffix, which fromisoformat rejects. Only hand it inputs with
+# a full extended date, no hour 24 and no trailing "z", so installing it never
+# changes what counts as explicit.
+_ISO_FAST_PATH = re.compile(
+    r"(?!.*z\Z)\d{4}-\d{2}-\d{2}(?:$|[Tt ](?!24))", re.ASCII
 )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TimeResolution:
     """Represents the outcome of attempting to resolve a time reference."""
 
@@ -42,17 +87,39 @@ class TimeResolution:
     is_relative: bool
 
 
-def now_local() -> datetime:
-    return datetime.now(LOCAL_ZONE)
+_EMPTY_RESOLUTION = TimeResolution(None, 0.0, "", False)
+
+
+# (monotonic reading, local time) from the last now_local() call.
+_now_cache: Optional[tuple[float, datetime]] = None
+
+
+def now_local(max_age: float = 0.0) -> datetime:
+    """Current local time; with max_age > 0, reuse a reading up to max_age seconds old."""
+    global _now_cache
+    if max_age > 0 and _now_cache is not None:
+        taken_at, cached = _now_cache
+        if monotonic() - taken_at < max_age:
+            return cached
+    current = datetime.now(_local_zone())
+    _now_cache = (monotonic(), current)
+    return current
 
 
 def format_human(dt: datetime) -> str:
-    localized = dt.astimezone(LOCAL_ZONE)
-    return localized.strftime("%A, %d %B %Y, %H:%M")
+    # The rendered text has minute resolution, so the epoch minute is a
+    # complete cache key.
+    return _format_human_cached(int(dt.timestamp() // 60))
+
+
+@lru_cache(maxsize=512)
+def _format_human_cached(epoch_minute: int) -> str:
+    localized = datetime.fromtimestamp(epoch_minute * 60, _local_zone())
+    return localized.strftime(HUMAN_FORMAT)
 
 
 def is_late_hour(dt: datetime) -> bool:
-    localized = dt.astimezone(LOCAL_ZONE)
+    localized = dt.astimezone(_local_zone())
     return localized.hour >= LATE_HOUR_THRESHOLD
 
 
@@ -67,10 +134,14 @@ def resolve_time_reference(value: Optional[str], reference: Optional[datetime] =
         0.0  = unable to interpret
     """
     if not value:
-        return TimeResolution(None, 0.0, value or "", False)
+        return _EMPTY_RESOLUTION
 
     reference = reference or now_local()
-    trimmed = value.strip()
+    # Most inputs arrive already trimmed; avoid allocating a copy for them.
+    if value[0].isspace() or value[-1].isspace():
+        trimmed = value.strip()
+    else:
+        trimmed = value
 
     iso_result = _try_parse_iso(trimmed)
     if iso_result:
@@ -83,52 +154,95 @@ def resolve_time_reference(value: Optional[str], reference: Optional[datetime] =
     return TimeResolution(None, 0.0, trimmed, False)
 
 
+@lru_cache(maxsize=1024)
 def _try_parse_iso(value: str) -> Optional[datetime]:
-    normalized = value.replace("Z", "+00:00")
-    try:
-        parsed = datetime.fromisoformat(normalized)
-    except ValueError:
-        return None
+    # Timestamps recur across calendar/task payloads; datetimes are immutable,
+    # so cached results are safe to share. Use _try_parse_iso.cache_clear()
+    # to reset between tests.
+    parsed = None
+    if _parse_iso_datetime is not None and _ISO_FAST_PATH.match(value):
+        try:
+            parsed = _parse_iso_datetime(value)
+        except ValueError:
+            pass
+    if parsed is None:
+        try:
+            if sys.version_info >= (3, 11):
+                # fromisoformat accepts a trailing "Z" natively from 3.11 on.
+                parsed = datetime.fromisoformat(value)
+            elif value.endswith("Z"):
+                parsed = datetime.fromisoformat(value[:-1] + "+00:00")
+            else:
+                parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    zone = _local_zone()
     if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=LOCAL_ZONE)
-    return parsed.astimezone(LOCAL_ZONE)
+        parsed = parsed.replace(tzinfo=zone)
+    return parsed.astimezone(zone)
 
 
 def _try_parse_relative(value: str, reference: datetime) -> Optional[TimeResolution]:
+    # Only the calendar date of the reference affects the result, so the
+    # cache key rolls over naturally at midnight.
+    return _try_parse_relative_cached(value, reference.date())
+
+
+@lru_cache(maxsize=256)
+def _try_parse_relative_cached(
+    value: str, reference_date: date
+) -> Optional[TimeResolution]:
+    # Keyword priority, not position, decides: "today or tomorrow" means
+    # tomorrow. Substring tests also see keywords that overlap a lower-priority
+    # one, as in "today after tomorrow", which a left-to-right regex scan hides.
     for keyword, offset_days in RELATIVE_KEYWORDS:
         if keyword in value:
-            target_date = (reference + timedelta(days=offset_days)).date()
-            extracted = _extract_time(value)
-            if extracted:
-                target_time, confidence = extracted
-            else:
-                target_time, confidence = time(9, 0), 0.6
-
-            if keyword == "tonight" and not extracted:
-                target_time = time(20, 0)
-                confidence = 0.7
-
-            localized_dt = datetime.combine(
-                target_date,
-                target_time,
-                tzinfo=LOCAL_ZONE,
-            )
-            if offset_days == 0 and keyword != "today":
-                # Words like tonight still count as relative
-                relative_flag = True
-            else:
-                relative_flag = True
-            return TimeResolution(
-                iso=localized_dt.isoformat(),
-                confidence=min(0.9, confidence),
-                source_text=value,
-                is_relative=relative_flag,
-            )
-    return None
+            break
+    else:
+        return None
+
+    target_date = reference_date + timedelta(days=offset_days)
+    extracted = _extract_time(value)
+    if extracted:
+        target_time, confidence = extracted
+    else:
+        target_time, confidence = _DEFAULT_TIME, 0.6
+
+    if keyword == "tonight" and not extracted:
+        target_time = _TONIGHT_TIME
+        confidence = 0.7
+
+    localized_dt = datetime.combine(
+        target_date,
+        target_time,
+        tzinfo=_local_offset(target_date, target_time),
+    )
+    if offset_days == 0 and keyword != "today":
+        # Words like tonight still count as relative
+        relative_flag = True
+    else:
+        relative_flag = True
+    return TimeResolution(
+        iso=localized_dt.isoformat(),
+        confidence=min(0.9, confidence),
+        source_text=value,
+        is_relative=relative_flag,
+    )
+
+
+@lru_cache(maxsize=256)
+def _local_offset(target_date: date, target_time: time) -> timezone:
+    # Resolve the zone's UTC offset once per wall-clock slot and hand back a
+    # fixed-offset tzinfo, avoiding repeated tz transition lookups. Keyed on
+    # the time as well as the date so DST switch days stay correct.
+    localized = datetime.combine(target_date, target_time, tzinfo=_local_zone())
+    return timezone(localized.utcoffset())
 
 
 def _extract_time(value: str) -> Optional[tuple[time, float]]:
-    match = TIME_PATTERN.search(value)
+    if _DIGIT_RE.search(value) is None:
+        return None
+    match = _time_search(value)
     if not match:
         return None
 
@@ -137,10 +251,12 @@ def _extract_time(value: str) -> Optional[tuple[time, float]]:
     ampm = match.group("ampm")
 
     if ampm:
-        ampm = ampm.lower()
-        if ampm == "pm" and hour < 12:
+        # Checked by first character so the suffix isn't lowercased; hours
+        # outside 1-12 fall through to the clamp below unchanged.
+        is_pm = ampm[0] in "pP"
+        if is_pm and hour < 12:
             hour += 12
-        if ampm == "am" and hour == 12:
+        if not is_pm and hour == 12:
             hour = 0
     elif hour == 24:
         hour = 0
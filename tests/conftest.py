@@ -3,31 +3,95 @@ Pytest configuration and shared fixtures
 """
 
 import pytest
-import tempfile
 import os
+from contextlib import ExitStack
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
 
+# config reads the key at import time, so the default must exist before the
+# preload below (and before any test module pulls in src.config).
+if not os.getenv("OPENAI_API_KEY"):
+    os.environ["OPENAI_API_KEY"] = "test-key-for-testing-only"
 
-@pytest.fixture(scope="session", autouse=True)
-def setup_test_environment():
-    """Set up test environment variables"""
-    # Set test API key if not already set
-    if not os.getenv("OPENAI_API_KEY"):
-        os.environ["OPENAI_API_KEY"] = "test-key-for-testing-only"
-    
-    yield
-    
-    # Cleanup if needed
-    pass
+# Import the application package once per worker at collection time rather
+# than lazily inside whichever test touches it first.
+import src.conversation_manager  # noqa: E402,F401
+import src.storage  # noqa: E402,F401
+import src.openai_client  # noqa: E402,F401
+import src.time_utils  # noqa: E402,F401
+import src.tasks.task_manager  # noqa: E402,F401
+import src.tasks.task_storage  # noqa: E402,F401
+
+
+@pytest.fixture(scope="session")
+def system_prompt():
+    """The configured system prompt, read once per session"""
+    from src.config import SYSTEM_PROMPT
+    return SYSTEM_PROMPT
 
 
 @pytest.fixture
-def temp_storage_file():
+def temp_storage_file(tmp_path_factory):
     """Create a temporary storage file for testing"""
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-    temp_file.close()
-    yield temp_file.name
-    # Cleanup
-    if os.path.exists(temp_file.name):
-        os.unlink(temp_file.name)
+    # pytest removes the base temp directory itself, so no per-test unlink.
+    storage_path = tmp_path_factory.mktemp("storage") / "conversations.json"
+    storage_path.write_text("")
+    yield str(storage_path)
+
+
+@pytest.fixture
+def write_opens(monkeypatch):
+    """Record every Path opened for writing; one entry per file write"""
+    opened = []
+    real_open = Path.open
+
+    def counting_open(self, mode='r', *args, **kwargs):
+        if 'w' in mode or 'a' in mode:
+            opened.append(self)
+        return real_open(self, mode, *args, **kwargs)
+
+    monkeypatch.setattr(Path, 'open', counting_open)
+    return opened
+
+
+@pytest.fixture
+def mocked_google_creds():
+    """Patch Google credential loading and token-file existence checks"""
+    with patch(
+        'src.calendar.google_calendar_provider.Credentials'
+    ) as credentials_class, patch('pathlib.Path.exists', return_value=True) as exists:
+        yield credentials_class, exists
 
+
+@pytest.fixture
+def cm_mocks():
+    """Patch every ConversationManager collaborator in one ExitStack"""
+    with ExitStack() as stack:
+        def start(target, **kwargs):
+            return stack.enter_context(patch(target, **kwargs))
+
+        # spec=True (not autospec) checks attribute names against the real
+        # class without introspecting every method signature per test.
+        yield SimpleNamespace(
+            openai=start('src.conversation_manager.OpenAIClient', spec=True),
+            storage=start('src.conversation_manager.ConversationStorage', spec=True),
+            calendar=start('src.calendar.GoogleCalendarProvider'),
+            tasks=start('src.tasks.TaskManager'),
+        )
+
+
+@pytest.fixture
+def storage_mock(cm_mocks):
+    """Storage mock whose sessions start with a system message"""
+    storage = cm_mocks.storage.return_value
+    storage.get_or_create_session.return_value = {
+        "messages": [{"role": "system", "content": "You are Jarvis"}]
+    }
+    return storage
+
+
+@pytest.fixture
+def openai_client_mock(cm_mocks):
+    """OpenAI client mock handed to ConversationManager"""
+    return cm_mocks.openai.return_value
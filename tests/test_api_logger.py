@@ -6,13 +6,17 @@ import pytest
 from src.api_logger import ApiLogger
 
 
+@pytest.fixture(autouse=True)
+def _fallback_warning_level(caplog):
+    caplog.set_level(logging.WARNING, logger="jarvis.api_fallback")
+
+
 def test_log_call_disabled_emits_single_warning(caplog):
     with patch('src.api_logger.ENABLE_LOGGING', False):
         logger = ApiLogger()
 
-    with caplog.at_level(logging.WARNING, logger="jarvis.api_fallback"):
-        logger.log_call(service="openai", action="chat", error="boom")
-        logger.log_call(service="openai", action="chat", error="second error")
+    logger.log_call(service="openai", action="chat", error="boom")
+    logger.log_call(service="openai", action="chat", error="second error")
 
     warnings = [record for record in caplog.records if record.name == "jarvis.api_fallback"]
     assert len(warnings) == 1
@@ -26,8 +30,7 @@ def test_log_call_enabled_skips_fallback_warning(caplog):
     ):
         logger = ApiLogger()
 
-    with caplog.at_level(logging.WARNING, logger="jarvis.api_fallback"):
-        logger.log_call(service="openai", action="chat", error="boom")
+    logger.log_call(service="openai", action="chat", error="boom")
 
     warnings = [record for record in caplog.records if record.name == "jarvis.api_fallback"]
     assert warnings == []
@@ -50,11 +50,9 @@ class TestGoogleCalendarProvider:
         assert provider.credentials_path == Path("custom_creds.json")
         assert provider.token_path == Path("custom_token.json")
     
-    @patch('src.calendar.google_calendar_provider.Credentials')
-    @patch('pathlib.Path.exists')
-    def test_ensure_authenticated_with_valid_token(self, mock_exists, mock_credentials_class):
+    def test_ensure_authenticated_with_valid_token(self, mocked_google_creds):
         """Test authentication with existing valid token"""
-        mock_exists.return_value = True
+        mock_credentials_class, _ = mocked_google_creds
         mock_creds = MagicMock()
         mock_creds.valid = True
         mock_credentials_class.from_authorized_user_file.return_value = mock_creds
@@ -65,11 +63,9 @@ class TestGoogleCalendarProvider:
         assert creds == mock_creds
         assert provider._creds == mock_creds
     
-    @patch('src.calendar.google_calendar_provider.Credentials')
-    @patch('pathlib.Path.exists')
-    def test_ensure_authenticated_with_expired_token(self, mock_exists, mock_credentials_class):
+    def test_ensure_authenticated_with_expired_token(self, mocked_google_creds):
         """Test authentication with expired token that can be refreshed"""
-        mock_exists.return_value = True
+        mock_credentials_class, _ = mocked_google_creds
         mock_creds = MagicMock()
         mock_creds.valid = False
         mock_creds.expired = True
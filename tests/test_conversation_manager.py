@@ -10,93 +10,145 @@ from src.config import MAX_MESSAGE_LENGTH
 from src.openai_client import ModelResponse, ToolRequest
 
 
-class TestConversationManager:
-    """Test ConversationManager class"""
-    
-    def setup_method(self):
-        """Set up test fixtures"""
-        with patch('src.conversation_manager.OpenAIClient'), patch(
-            'src.conversation_manager.GoogleCalendarProvider'
-        ), patch('src.conversation_manager.TaskManager'):
-            self.manager = ConversationManager()
+# Tool-call round trips are built once at import; ConversationManager only
+# reads these objects, so sharing them across tests is safe.
+_CAL_TOOL_REQ = ToolRequest(
+    id="tool_1",
+    name="create_calendar_event",
+    arguments={
+        "summary": "Meeting",
+        "start_time": "2024-03-01T10:00:00Z",
+        "end_time": "2024-03-01T11:00:00Z",
+    },
+)
+_CAL_FIRST_RESP = ModelResponse(
+    content=None,
+    tool_calls=[_CAL_TOOL_REQ],
+    message={
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": "tool_1",
+                "type": "function",
+                "function": {
+                    "name": "create_calendar_event",
+                    "arguments": '{"summary": "Meeting"}',
+                },
+            }
+        ],
+    },
+    finish_reason="tool_calls",
+)
+_CAL_FINAL_RESP = ModelResponse(
+    content="Event created!",
+    tool_calls=[],
+    message={"role": "assistant", "content": "Event created!"},
+    finish_reason="stop",
+)
+
+_TASK_TOOL_REQ = ToolRequest(
+    id="tool_task",
+    name="create_task",
+    arguments={"title": "Pay bills"},
+)
+_TASK_FIRST_RESP = ModelResponse(
+    content=None,
+    tool_calls=[_TASK_TOOL_REQ],
+    message={
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {
+                "id": "tool_task",
+                "type": "function",
+                "function": {
+                    "name": "create_task",
+                    "arguments": '{"title": "Pay bills"}',
+                },
+            }
+        ],
+    },
+    finish_reason="tool_calls",
+)
+_TASK_FINAL_RESP = ModelResponse(
+    content="Task added!",
+    tool_calls=[],
+    message={"role": "assistant", "content": "Task added!"},
+    finish_reason="stop",
+)
+
+
+def _skip_registration(self):
+    # Intentionally skip registering handlers for configured tools
+    return None
+
+
+def _register_rogue_handler(self):
+    self.tool_handlers['rogue_tool'] = lambda _: None
+
+
+@pytest.fixture(scope="module")
+def cm():
+    """Manager for construction checks, built once per module"""
+    with patch('src.conversation_manager.OpenAIClient'), patch(
+        'src.conversation_manager.ConversationStorage'
+    ), patch('src.calendar.GoogleCalendarProvider'), patch('src.tasks.TaskManager'):
+        manager = ConversationManager()
+    # Patches are released before yielding so they don't leak into other tests.
+    yield manager
+
+
+class TestValidate:
+    """Test ConversationManager construction and message validation"""
     
-    def test_initialization(self):
+    def test_initialization(self, cm):
         """Test that manager initializes correctly"""
-        assert self.manager.storage is not None
-        assert self.manager.api_client is not None
-    
-    def test_validate_message_empty(self):
-        """Test validation of empty message"""
-        is_valid, error = self.manager.validate_message("")
-        assert is_valid is False
-        assert "empty" in error.lower()
-    
-    def test_validate_message_whitespace_only(self):
-        """Test validation of whitespace-only message"""
-        is_valid, error = self.manager.validate_message("   \n\t  ")
-        assert is_valid is False
-        assert "empty" in error.lower()
-    
-    def test_validate_message_valid(self):
-        """Test validation of valid message"""
-        is_valid, error = self.manager.validate_message("Hello, Jarvis!")
-        assert is_valid is True
-        assert error is None
+        assert cm.storage is not None
+        assert cm.api_client is not None
     
-    def test_validate_message_too_long(self):
-        """Test validation of message exceeding length limit"""
-        long_message = "x" * (MAX_MESSAGE_LENGTH + 1)
-        is_valid, error = self.manager.validate_message(long_message)
-        assert is_valid is False
-        assert str(MAX_MESSAGE_LENGTH) in error
-    
-    def test_validate_message_at_limit(self):
-        """Test validation of message at exact limit"""
-        message = "x" * MAX_MESSAGE_LENGTH
-        is_valid, error = self.manager.validate_message(message)
-        assert is_valid is True
-        assert error is None
-    
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_process_message_success(
-        self, mock_openai_class, mock_storage_class, mock_calendar_class, mock_task_manager
-    ):
+    @pytest.mark.parametrize(
+        "message, expected_valid, error_fragment",
+        [
+            ("", False, "empty"),
+            ("   \n\t  ", False, "empty"),
+            ("Hello, Jarvis!", True, None),
+            ("x" * (MAX_MESSAGE_LENGTH + 1), False, str(MAX_MESSAGE_LENGTH)),
+            ("x" * MAX_MESSAGE_LENGTH, True, None),
+        ],
+        ids=["empty", "whitespace_only", "valid", "too_long", "at_limit"],
+    )
+    def test_validate_message(self, message, expected_valid, error_fragment):
+        """Test message validation rules"""
+        is_valid, error = ConversationManager.validate_message(message)
+        assert is_valid is expected_valid
+        if error_fragment is None:
+            assert error is None
+        else:
+            assert error_fragment in error.lower()
+
+
+class TestProcessMessage:
+    """Test ConversationManager message processing and tool execution"""
+
+    def test_process_message_success(self, storage_mock, openai_client_mock):
         """Test successful message processing"""
         # Setup mocks
-        mock_storage = Mock()
-        mock_storage.get_or_create_session.return_value = {
-            "messages": [{"role": "system", "content": "You are Jarvis"}]
-        }
-        mock_storage_class.return_value = mock_storage
-        
-        mock_client = Mock()
-        mock_client.get_response.return_value = ModelResponse(
+        openai_client_mock.get_response.return_value = ModelResponse(
             content="Hello! How can I help?",
             tool_calls=[],
             message={"role": "assistant", "content": "Hello! How can I help?"},
             finish_reason="stop",
         )
-        mock_openai_class.return_value = mock_client
-        mock_calendar_class.return_value = Mock()
-        mock_task_manager.return_value = Mock()
         
         manager = ConversationManager()
         response, error = manager.process_message("session1", "Hello")
         
         assert error is None
         assert response == "Hello! How can I help?"
-        mock_storage.add_message.assert_called()
+        storage_mock.add_message.assert_called()
     
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_process_message_validation_failure(
-        self, mock_openai_class, mock_storage_class, mock_calendar_class, mock_task_manager
-    ):
+    def test_process_message_validation_failure(self, cm_mocks):
         """Test message processing with validation failure"""
         manager = ConversationManager()
         response, error = manager.process_message("session1", "")
@@ -105,25 +157,9 @@ class TestConversationManager:
         assert error is not None
         assert "empty" in error.lower()
     
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_process_message_api_error(
-        self, mock_openai_class, mock_storage_class, mock_calendar_class, mock_task_manager
-    ):
+    def test_process_message_api_error(self, storage_mock, openai_client_mock):
         """Test message processing with API error"""
-        mock_storage = Mock()
-        mock_storage.get_or_create_session.return_value = {
-            "messages": [{"role": "system", "content": "You are Jarvis"}]
-        }
-        mock_storage_class.return_value = mock_storage
-        
-        mock_client = Mock()
-        mock_client.get_response.side_effect = Exception("API Error")
-        mock_openai_class.return_value = mock_client
-        mock_calendar_class.return_value = Mock()
-        mock_task_manager.return_value = Mock()
+        openai_client_mock.get_response.side_effect = Exception("API Error")
         
         manager = ConversationManager()
         response, error = manager.process_message("session1", "Hello")
@@ -132,178 +168,58 @@ class TestConversationManager:
         assert error is not None
         assert "API Error" in error
     
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
     def test_process_message_with_tool_call(
-        self, mock_openai_class, mock_storage_class, mock_calendar_class, mock_task_manager
+        self, cm_mocks, storage_mock, openai_client_mock
     ):
         """Test processing when model requests a calendar tool"""
-        mock_storage = Mock()
-        mock_storage.get_or_create_session.return_value = {
-            "messages": [{"role": "system", "content": "You are Jarvis"}]
-        }
-        mock_storage_class.return_value = mock_storage
-
         mock_calendar = Mock()
         mock_calendar.list_events_in_range.return_value = []
         fake_event = Mock()
         fake_event.to_dict.return_value = {"id": "evt_10", "summary": "Meeting"}
         mock_calendar.create_event.return_value = fake_event
         mock_calendar.get_event.return_value = fake_event
-        mock_calendar_class.return_value = mock_calendar
-        mock_task_manager.return_value = Mock()
+        cm_mocks.calendar.return_value = mock_calendar
 
-        tool_request = ToolRequest(
-            id="tool_1",
-            name="create_calendar_event",
-            arguments={
-                "summary": "Meeting",
-                "start_time": "2024-03-01T10:00:00Z",
-                "end_time": "2024-03-01T11:00:00Z",
-            },
-        )
-        assistant_tool_message = {
-            "role": "assistant",
-            "content": None,
-            "tool_calls": [
-                {
-                    "id": "tool_1",
-                    "type": "function",
-                    "function": {
-                        "name": "create_calendar_event",
-                        "arguments": '{"summary": "Meeting"}',
-                    },
-                }
-            ],
-        }
-        first_response = ModelResponse(
-            content=None,
-            tool_calls=[tool_request],
-            message=assistant_tool_message,
-            finish_reason="tool_calls",
-        )
-        second_response = ModelResponse(
-            content="Event created!",
-            tool_calls=[],
-            message={"role": "assistant", "content": "Event created!"},
-            finish_reason="stop",
-        )
-
-        mock_client = Mock()
-        mock_client.get_response.side_effect = [first_response, second_response]
-        mock_openai_class.return_value = mock_client
+        openai_client_mock.get_response.side_effect = [_CAL_FIRST_RESP, _CAL_FINAL_RESP]
 
         manager = ConversationManager()
         response, error = manager.process_message("session1", "Schedule a meeting")
 
         assert error is None
         assert response == "Event created!"
-        mock_calendar.create_event.assert_called_once()
+        assert mock_calendar.create_event.call_count == 1
 
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
     def test_process_message_with_task_tool_call(
-        self, mock_openai_class, mock_storage_class, mock_calendar_class, mock_task_manager
+        self, cm_mocks, storage_mock, openai_client_mock
     ):
         """Test task creation via tool call"""
-        mock_storage = Mock()
-        mock_storage.get_or_create_session.return_value = {
-            "messages": [{"role": "system", "content": "You are Jarvis"}]
-        }
-        mock_storage_class.return_value = mock_storage
-
-        mock_calendar_class.return_value = Mock()
         mock_task = {"id": "task_1", "title": "Pay bills", "status": "pending"}
-        mock_task_manager.return_value.create_task.return_value = mock_task
+        cm_mocks.tasks.return_value.create_task.return_value = mock_task
 
-        tool_request = ToolRequest(
-            id="tool_task",
-            name="create_task",
-            arguments={"title": "Pay bills"},
-        )
-        assistant_tool_message = {
-            "role": "assistant",
-            "content": None,
-            "tool_calls": [
-                {
-                    "id": "tool_task",
-                    "type": "function",
-                    "function": {
-                        "name": "create_task",
-                        "arguments": '{"title": "Pay bills"}',
-                    },
-                }
-            ],
-        }
-        first_response = ModelResponse(
-            content=None,
-            tool_calls=[tool_request],
-            message=assistant_tool_message,
-            finish_reason="tool_calls",
-        )
-        final_response = ModelResponse(
-            content="Task added!",
-            tool_calls=[],
-            message={"role": "assistant", "content": "Task added!"},
-            finish_reason="stop",
-        )
-
-        mock_client = Mock()
-        mock_client.get_response.side_effect = [first_response, final_response]
-        mock_openai_class.return_value = mock_client
+        openai_client_mock.get_response.side_effect = [_TASK_FIRST_RESP, _TASK_FINAL_RESP]
 
         manager = ConversationManager()
         response, error = manager.process_message("session1", "Remind me to pay bills")
 
         assert error is None
         assert response == "Task added!"
-        mock_task_manager.return_value.create_task.assert_called_once_with(
-            title="Pay bills",
-            description=None,
-            due_date=None,
-            priority="normal",
-        )
-
-    @patch('src.conversation_manager.ENABLE_CALENDAR', False)
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_calendar_tools_disabled_message(
-        self,
-        mock_openai_class,
-        mock_storage_class,
-        mock_calendar_class,
-        mock_task_manager,
-    ):
-        mock_storage = Mock()
-        mock_storage.get_or_create_session.return_value = {"messages": []}
-        mock_storage_class.return_value = mock_storage
-        mock_openai_class.return_value = Mock()
-        mock_calendar_class.return_value = Mock()
-        mock_task_manager.return_value = Mock()
-
-        manager = ConversationManager()
-        tool_request = ToolRequest(id="t1", name="list_upcoming_events", arguments={})
-        result = manager._execute_tool(tool_request)
-        assert result["success"] is False
-        assert "disabled" in result["error"].lower()
+        create_task = cm_mocks.tasks.return_value.create_task
+        assert create_task.call_count == 1
+        assert create_task.call_args.kwargs == {
+            "title": "Pay bills",
+            "description": None,
+            "due_date": None,
+            "priority": "normal",
+        }
 
     @patch('src.conversation_manager.resolve_time_reference')
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
     def test_create_event_requires_confirmation_when_low_confidence(
-        self, mock_calendar_class, mock_task_manager, mock_resolve
+        self, mock_resolve, cm_mocks
     ):
         """Low confidence dates should trigger confirmation requirement."""
         mock_calendar = Mock()
         mock_calendar.list_events_in_range.return_value = []
-        mock_calendar_class.return_value = mock_calendar
-        mock_task_manager.return_value = Mock()
+        cm_mocks.calendar.return_value = mock_calendar
 
         mock_resolve.side_effect = [
             SimpleNamespace(iso="2025-11-25T22:00:00+02:00", confidence=0.9, is_relative=True),
@@ -322,15 +238,10 @@ class TestConversationManager:
         assert payload["error"] == "DATE_CONFIRMATION_REQUIRED"
 
     @patch('src.conversation_manager.resolve_time_reference')
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    def test_create_task_returns_resolved_times(
-        self, mock_calendar_class, mock_task_manager, mock_resolve
-    ):
+    def test_create_task_returns_resolved_times(self, mock_resolve, cm_mocks):
         """Task creation response should surface interpreted due date."""
-        mock_calendar_class.return_value = Mock()
         mock_task = {"id": "task_99", "title": "Submit report", "status": "pending"}
-        mock_task_manager.return_value.create_task.return_value = mock_task
+        cm_mocks.tasks.return_value.create_task.return_value = mock_task
 
         mock_resolve.return_value = SimpleNamespace(
             iso="2025-11-25T09:00:00+02:00", confidence=1.0, is_relative=False
@@ -344,83 +255,40 @@ class TestConversationManager:
         assert "resolved_times" in payload
         assert "due_date" in payload["resolved_times"]
 
-    @patch('src.conversation_manager.ENABLE_TASKS', False)
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_task_tools_disabled_message(
-        self,
-        mock_openai_class,
-        mock_storage_class,
-        mock_calendar_class,
-        mock_task_manager,
-    ):
-        mock_storage = Mock()
-        mock_storage.get_or_create_session.return_value = {"messages": []}
-        mock_storage_class.return_value = mock_storage
-        mock_openai_class.return_value = Mock()
-        mock_calendar_class.return_value = Mock()
-        mock_task_manager.return_value = Mock()
-
+    @pytest.mark.parametrize(
+        "flag, tool, args",
+        [
+            ("ENABLE_CALENDAR", "list_upcoming_events", {}),
+            ("ENABLE_TASKS", "create_task", {"title": "Test"}),
+        ],
+        ids=["calendar", "tasks"],
+    )
+    def test_tool_disabled_message(self, cm_mocks, monkeypatch, flag, tool, args):
+        monkeypatch.setattr(f'src.conversation_manager.{flag}', False)
         manager = ConversationManager()
-        tool_request = ToolRequest(id="t2", name="create_task", arguments={"title": "Test"})
+        tool_request = ToolRequest(id="t1", name=tool, arguments=args)
         result = manager._execute_tool(tool_request)
         assert result["success"] is False
         assert "disabled" in result["error"].lower()
 
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_tool_configuration_guard_missing_handlers(
-        self,
-        mock_openai_class,
-        mock_storage_class,
-        mock_calendar_class,
-        mock_task_manager,
-    ):
-        mock_openai_class.return_value = Mock()
-        mock_storage_class.return_value = Mock()
-        mock_calendar_class.return_value = Mock()
-        mock_task_manager.return_value = Mock()
-
-        def noop_register(self):
-            # Intentionally skip registering handlers for configured tools
-            return None
-
-        with patch('src.conversation_manager.ENABLE_CALENDAR', True), patch(
-            'src.conversation_manager.ENABLE_TASKS', True
-        ), patch.object(
-            ConversationManager, '_register_tool_handlers', noop_register
-        ):
-            with pytest.raises(RuntimeError, match="Missing handlers"):
-                ConversationManager()
-
-    @patch('src.conversation_manager.TaskManager')
-    @patch('src.conversation_manager.GoogleCalendarProvider')
-    @patch('src.conversation_manager.ConversationStorage')
-    @patch('src.conversation_manager.OpenAIClient')
-    def test_tool_configuration_guard_unexpected_handler(
-        self,
-        mock_openai_class,
-        mock_storage_class,
-        mock_calendar_class,
-        mock_task_manager,
+    @pytest.mark.parametrize(
+        "enable_calendar, enable_tasks, register, match",
+        [
+            (True, True, _skip_registration, "Missing handlers"),
+            (
+                False,
+                False,
+                _register_rogue_handler,
+                "Handlers registered without tool metadata",
+            ),
+        ],
+        ids=["missing_handlers", "unexpected_handler"],
+    )
+    def test_tool_configuration_guard(
+        self, cm_mocks, monkeypatch, enable_calendar, enable_tasks, register, match
     ):
-        mock_openai_class.return_value = Mock()
-        mock_storage_class.return_value = Mock()
-        mock_calendar_class.return_value = Mock()
-        mock_task_manager.return_value = Mock()
-
-        def rogue_register(self):
-            self.tool_handlers['rogue_tool'] = lambda _: None
-
-        with patch('src.conversation_manager.ENABLE_CALENDAR', False), patch(
-            'src.conversation_manager.ENABLE_TASKS', False
-        ), patch.object(
-            ConversationManager, '_register_tool_handlers', rogue_register
-        ):
-            with pytest.raises(RuntimeError, match="Handlers registered without tool metadata"):
-                ConversationManager()
-
+        monkeypatch.setattr('src.conversation_manager.ENABLE_CALENDAR', enable_calendar)
+        monkeypatch.setattr('src.conversation_manager.ENABLE_TASKS', enable_tasks)
+        monkeypatch.setattr(ConversationManager, '_register_tool_handlers', register)
+        with pytest.raises(RuntimeError, match=match):
+            ConversationManager()
@@ -3,124 +3,138 @@ Tests for src/openai_client.py
 """
 
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock
 from src.openai_client import OpenAIClient
 
 
+# Plain namespaces: get_response only reads these attributes.
+_TEXT_COMPLETION = SimpleNamespace(
+    choices=[
+        SimpleNamespace(
+            message=SimpleNamespace(
+                content="Test response from AI", role="assistant", tool_calls=[]
+            ),
+            finish_reason="stop",
+        )
+    ]
+)
+
+
+@pytest.fixture(scope="module")
+def _shared_openai_client():
+    """One client built per module; patches are released before yielding"""
+    mock_client = MagicMock()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('src.openai_client.OPENAI_API_KEY', 'test-key-123')
+        mp.setattr('openai.OpenAI', lambda api_key=None: mock_client)
+        client = OpenAIClient()
+    yield client, mock_client
+
+
+@pytest.fixture
+def openai_client(_shared_openai_client):
+    """Shared client and its SDK mock, with call records reset per test"""
+    client, mock_client = _shared_openai_client
+    mock_client.reset_mock(return_value=True, side_effect=True)
+    return client, mock_client
+
+
+@pytest.fixture
+def api_logger_mock(monkeypatch):
+    """Replace the module's api_logger so log calls can be inspected"""
+    logger = Mock()
+    monkeypatch.setattr('src.openai_client.api_logger', logger)
+    return logger
+
+
 class TestOpenAIClient:
     """Test OpenAIClient class"""
     
-    @patch('src.openai_client.OPENAI_API_KEY', 'test-key-123')
-    def test_initialization_with_key(self):
+    def test_initialization_with_key(self, monkeypatch):
         """Test that client initializes with API key"""
-        with patch('src.openai_client.OpenAI') as mock_openai:
-            client = OpenAIClient()
-            assert client.model is not None
-            assert client.temperature is not None
-            mock_openai.assert_called_once_with(api_key='test-key-123')
+        mock_openai = Mock()
+        monkeypatch.setattr('src.openai_client.OPENAI_API_KEY', 'test-key-123')
+        monkeypatch.setattr('openai.OpenAI', mock_openai)
+        client = OpenAIClient()
+        assert client.model is not None
+        assert client.temperature is not None
+        mock_openai.assert_called_once_with(api_key='test-key-123')
     
-    @patch('src.openai_client.OPENAI_API_KEY', None)
-    def test_initialization_without_key_raises_error(self):
+    def test_initialization_without_key_raises_error(self, monkeypatch):
         """Test that initialization fails without API key"""
+        monkeypatch.setattr('src.openai_client.OPENAI_API_KEY', None)
         with pytest.raises(ValueError, match="OPENAI_API_KEY is not set"):
             OpenAIClient()
     
-    @patch('src.openai_client.OPENAI_API_KEY', 'test-key-123')
-    @patch('src.openai_client.api_logger')
-    def test_get_response_success(self, mock_logger):
-        """Test successful API response"""
-        with patch('src.openai_client.OpenAI') as mock_openai_class:
-            # Mock the OpenAI client and response
-            mock_client = MagicMock()
-            mock_openai_class.return_value = mock_client
-            
-            # Mock the chat completion response
-            mock_response = MagicMock()
-            mock_choice = MagicMock()
-            mock_message = MagicMock()
-            mock_message.content = "Test response from AI"
-            mock_message.role = "assistant"
-            mock_message.tool_calls = []
-            mock_choice.message = mock_message
-            mock_choice.finish_reason = "stop"
-            mock_response.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_response
-            
-            client = OpenAIClient()
-            messages = [{"role": "user", "content": "Hello"}]
+    @pytest.mark.parametrize(
+        "outcome, error_match",
+        [(_TEXT_COMPLETION, None), (Exception("API Error"), "OpenAI API error")],
+        ids=["success", "api_error"],
+    )
+    def test_get_response(self, api_logger_mock, openai_client, outcome, error_match):
+        """Test successful responses and API errors, including what gets logged"""
+        client, mock_client = openai_client
+        create = mock_client.chat.completions.create
+        # A one-item side_effect either returns the item or raises it.
+        create.side_effect = [outcome]
+        messages = [{"role": "user", "content": "Hello"}]
+        
+        if error_match:
+            with pytest.raises(Exception, match=error_match):
+                client.get_response(messages)
+        else:
             response = client.get_response(messages)
-            
             assert response.content == "Test response from AI"
             assert response.tool_calls == []
             assert response.message["content"] == "Test response from AI"
-            mock_client.chat.completions.create.assert_called_once()
-            mock_logger.log_call.assert_called_once()
-            log_kwargs = mock_logger.log_call.call_args.kwargs
-            assert log_kwargs["service"] == "openai"
+        
+        assert create.call_count == 1
+        assert api_logger_mock.log_call.call_count == 1
+        log_kwargs = api_logger_mock.log_call.call_args.kwargs
+        assert log_kwargs["service"] == "openai"
+        if error_match:
+            assert "API Error" in log_kwargs["error"]
+        else:
             assert log_kwargs.get("error") is None
             assert log_kwargs["response"]["choice_count"] == 1
     
-    @patch('src.openai_client.OPENAI_API_KEY', 'test-key-123')
-    @patch('src.openai_client.api_logger')
-    def test_get_response_with_tool_call(self, mock_logger):
+    def test_get_response_with_tool_call(self, api_logger_mock, openai_client):
         """Test that tool calls are parsed correctly"""
-        with patch('src.openai_client.OpenAI') as mock_openai_class:
-            mock_client = MagicMock()
-            mock_openai_class.return_value = mock_client
-            
-            mock_response = MagicMock()
-            mock_choice = MagicMock()
-            mock_tool_function = MagicMock()
-            mock_tool_function.name = "list_upcoming_events"
-            mock_tool_function.arguments = '{"max_results": 3}'
-            mock_tool_call = MagicMock()
-            mock_tool_call.id = "tool_123"
-            mock_tool_call.type = "function"
-            mock_tool_call.function = mock_tool_function
-            
-            mock_message = MagicMock()
-            mock_message.content = None
-            mock_message.role = "assistant"
-            mock_message.tool_calls = [mock_tool_call]
-            
-            mock_choice.message = mock_message
-            mock_choice.finish_reason = "tool_calls"
-            mock_response.choices = [mock_choice]
-            mock_client.chat.completions.create.return_value = mock_response
-            
-            client = OpenAIClient()
-            response = client.get_response([{"role": "user", "content": "Hello"}])
-            
-            assert response.content is None
-            assert len(response.tool_calls) == 1
-            assert response.tool_calls[0].name == "list_upcoming_events"
-            assert response.tool_calls[0].arguments == {"max_results": 3}
-            mock_logger.log_call.assert_called_once()
-    
-    @patch('src.openai_client.OPENAI_API_KEY', 'test-key-123')
-    @patch('src.openai_client.api_logger')
-    def test_get_response_api_error(self, mock_logger):
-        """Test handling of API errors"""
-        with patch('src.openai_client.OpenAI') as mock_openai_class:
-            mock_client = MagicMock()
-            mock_openai_class.return_value = mock_client
-            mock_client.chat.completions.create.side_effect = Exception("API Error")
-            
-            client = OpenAIClient()
-            messages = [{"role": "user", "content": "Hello"}]
-            
-            with pytest.raises(Exception, match="OpenAI API error"):
-                client.get_response(messages)
-            mock_logger.log_call.assert_called_once()
-            log_kwargs = mock_logger.log_call.call_args.kwargs
-            assert log_kwargs["service"] == "openai"
-            assert "API Error" in log_kwargs["error"]
+        client, mock_client = openai_client
 
-    @patch('src.openai_client.ENABLE_CALENDAR', False)
-    @patch('src.openai_client.ENABLE_TASKS', False)
-    def test_client_without_tools(self):
+        mock_tool_call = SimpleNamespace(
+            id="tool_123",
+            type="function",
+            function=SimpleNamespace(
+                name="list_upcoming_events", arguments='{"max_results": 3}'
+            ),
+        )
+        mock_response = SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(
+                        content=None, role="assistant", tool_calls=[mock_tool_call]
+                    ),
+                    finish_reason="tool_calls",
+                )
+            ]
+        )
+        mock_client.chat.completions.create.return_value = mock_response
+        
+        response = client.get_response([{"role": "user", "content": "Hello"}])
+        
+        assert response.content is None
+        assert len(response.tool_calls) == 1
+        assert response.tool_calls[0].name == "list_upcoming_events"
+        assert response.tool_calls[0].arguments == {"max_results": 3}
+        api_logger_mock.log_call.assert_called_once()
+    
+    def test_client_without_tools(self, monkeypatch):
         """Client should omit tools when features disabled"""
-        with patch('src.openai_client.OpenAI'):
-            client = OpenAIClient()
-            assert client.tools == []
+        monkeypatch.setattr('src.openai_client.ENABLE_CALENDAR', False)
+        monkeypatch.setattr('src.openai_client.ENABLE_TASKS', False)
+        monkeypatch.setattr('openai.OpenAI', Mock())
+        client = OpenAIClient()
+        assert client.tools == []
 
@@ -3,92 +3,107 @@ Tests for src/storage.py
 """
 
 import json
-import tempfile
-import os
-from pathlib import Path
+import pytest
+from src.json_utils import dumps_line
 from src.storage import ConversationStorage
-from src.config import SYSTEM_PROMPT
+
+
+@pytest.fixture(scope="module")
+def seeded_storage_bytes(tmp_path_factory):
+    """Serialized storage holding one seeded session, encoded once per module"""
+    seed_file = tmp_path_factory.mktemp("seed") / "conversations.json"
+    ConversationStorage(storage_file=str(seed_file)).get_or_create_session("__seed__")
+    return seed_file.read_bytes()
 
 
 class TestConversationStorage:
     """Test ConversationStorage class"""
     
-    def setup_method(self):
-        """Set up test fixtures"""
-        # Create a temporary file for testing
-        self.temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json')
-        self.temp_file.close()
-        self.storage = ConversationStorage(storage_file=self.temp_file.name)
+    @pytest.fixture(scope="class", autouse=True)
+    def _tmpdir(self, request, tmp_path_factory):
+        """One temp directory for the whole class; pytest removes it later"""
+        request.cls._tmpdir = tmp_path_factory.mktemp(request.cls.__name__)
     
-    def teardown_method(self):
-        """Clean up test fixtures"""
-        if os.path.exists(self.temp_file.name):
-            os.unlink(self.temp_file.name)
+    @pytest.fixture(autouse=True)
+    def _storage(self, request, seeded_storage_bytes):
+        """Point storage at a pre-seeded, per-test file in the class directory"""
+        self.storage_path = self._tmpdir / f"{request.node.name}.json"
+        self.storage_path.write_bytes(seeded_storage_bytes)
+        self.storage = ConversationStorage(storage_file=str(self.storage_path))
     
     def test_storage_initialization(self):
         """Test that storage initializes correctly"""
-        assert self.storage.storage_file == self.temp_file.name
-        assert Path(self.temp_file.name).exists()
+        assert self.storage.storage_file == str(self.storage_path)
+        # An existing file is left untouched.
+        assert json.loads(self.storage_path.read_bytes())["conversations"][0][
+            "session_id"
+        ] == "__seed__"
     
     def test_ensure_storage_file_creates_file(self):
         """Test that ensure_storage_file creates file if missing"""
         # Delete the file
-        os.unlink(self.temp_file.name)
+        self.storage_path.unlink()
         # Reinitialize storage
-        storage = ConversationStorage(storage_file=self.temp_file.name)
-        assert Path(self.temp_file.name).exists()
+        storage = ConversationStorage(storage_file=str(self.storage_path))
+        assert json.loads(self.storage_path.read_bytes()) == {"conversations": []}
     
-    def test_load_conversations_empty(self):
-        """Test loading empty conversations"""
-        data = self.storage.load_conversations()
-        assert isinstance(data, dict)
-        assert "conversations" in data
-        assert isinstance(data["conversations"], list)
+    @pytest.mark.parametrize(
+        "contents", [b"", b'{"conversations": ['], ids=["empty", "truncated"]
+    )
+    def test_load_conversations_empty(self, contents):
+        """Test that an empty or corrupt file loads as no conversations"""
+        self.storage_path.write_bytes(contents)
+        assert self.storage.load_conversations() == {"conversations": []}
     
-    def test_save_and_load_conversations(self):
+    def test_save_and_load_conversations(self, write_opens):
         """Test saving and loading conversations"""
         test_data = {
             "conversations": [
                 {
                     "session_id": "test123",
-                    "messages": [{"role": "system", "content": "test"}]
+                    "messages": [{"role": "system", "content": "test – ünïcode"}]
                 }
             ]
         }
         self.storage.save_conversations(test_data)
+        assert write_opens == [self.storage_path]
         loaded = self.storage.load_conversations()
-        assert loaded["conversations"][0]["session_id"] == "test123"
+        assert loaded == test_data
+        assert json.loads(self.storage_path.read_text(encoding='utf-8')) == test_data
     
-    def test_get_or_create_session_new(self):
+    def test_get_or_create_session_new(self, system_prompt):
         """Test creating a new session"""
         session = self.storage.get_or_create_session("new_session")
         assert session["session_id"] == "new_session"
         assert len(session["messages"]) == 1
         assert session["messages"][0]["role"] == "system"
-        assert session["messages"][0]["content"] == SYSTEM_PROMPT
+        assert session["messages"][0]["content"] == system_prompt
         assert "created_at" in session
     
     def test_get_or_create_session_existing(self):
         """Test retrieving an existing session"""
         # Create a session and add a message using the proper method
-        self.storage.get_or_create_session("existing")
-        self.storage.add_message("existing", "user", "test message")
+        with self.storage.buffered():
+            self.storage.get_or_create_session("existing")
+            self.storage.add_message("existing", "user", "test message")
         
         # Retrieve it
         session2 = self.storage.get_or_create_session("existing")
         assert session2["session_id"] == "existing"
         assert len(session2["messages"]) >= 2
-        # Should have system message and user message
-        assert any(msg["role"] == "user" and msg["content"] == "test message" 
-                  for msg in session2["messages"])
+        # Messages are kept in insertion order (part of the storage contract),
+        # so the newest one is always last.
+        last = session2["messages"][-1]
+        assert last["role"] == "user" and last["content"] == "test message"
     
     def test_add_message_to_existing_session(self):
         """Test adding message to existing session"""
         session_id = "test_session"
-        self.storage.get_or_create_session(session_id)
-        self.storage.add_message(session_id, "user", "Hello")
+        with self.storage.buffered():
+            self.storage.get_or_create_session(session_id)
+            self.storage.add_message(session_id, "user", "Hello")
         
-        session = self.storage.get_or_create_session(session_id)
+        session = self.storage.get_session(session_id)
         assert len(session["messages"]) == 2  # system + user
         assert session["messages"][-1]["role"] == "user"
         assert session["messages"][-1]["content"] == "Hello"
@@ -98,7 +113,134 @@ class TestConversationStorage:
         session_id = "new_session_from_message"
         self.storage.add_message(session_id, "user", "First message")
         
-        session = self.storage.get_or_create_session(session_id)
+        session = self.storage.get_session(session_id)
         assert len(session["messages"]) == 2  # system + user
         assert session["messages"][-1]["content"] == "First message"
+    
+    def test_get_session_is_read_only(self, write_opens):
+        """Test that get_session returns None for unknown ids without writing"""
+        before = self.storage_path.read_bytes()
+        assert self.storage.get_session("missing") is None
+        assert self.storage.get_session("__seed__")["session_id"] == "__seed__"
+        assert write_opens == []
+        assert self.storage_path.read_bytes() == before
+    
+    def test_buffered_writes_file_once_on_exit(self, write_opens):
+        """Test that buffered() defers every save to a single write on exit"""
+        before = self.storage_path.read_bytes()
+        with self.storage.buffered():
+            self.storage.get_or_create_session("buffered")
+            self.storage.add_message("buffered", "user", "Hello")
+            self.storage.add_message("buffered", "assistant", "Hi")
+            assert self.storage_path.read_bytes() == before
+        assert len(write_opens) == 1
+        
+        reloaded = ConversationStorage(storage_file=str(self.storage_path))
+        session = reloaded.get_or_create_session("buffered")
+        assert [msg["content"] for msg in session["messages"][1:]] == ["Hello", "Hi"]
+
 
+class TestJsonlConversationStorage:
+    """Test ConversationStorage in per-session JSON Lines mode"""
+    
+    @pytest.fixture
+    def storage(self, tmp_path):
+        return ConversationStorage(
+            storage_file=str(tmp_path / "conversations.json"), mode="jsonl"
+        )
+    
+    def test_add_message_to_existing_session(self, storage, system_prompt):
+        """Test that appended messages survive a reload"""
+        storage.get_or_create_session("test_session")
+        storage.add_message("test_session", "user", "Hello", tool_call_id="t1")
+        
+        reloaded = ConversationStorage(storage_file=storage.storage_file, mode="jsonl")
+        session = reloaded.get_or_create_session("test_session")
+        assert session["session_id"] == "test_session"
+        assert "created_at" in session
+        assert session["messages"] == [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "Hello", "tool_call_id": "t1"},
+        ]
+    
+    def test_append_only_adds_message_lines(self, storage, write_opens):
+        """Test that add_message appends one line per message and rewrites nothing"""
+        storage.get_or_create_session("appends")
+        session_file = storage._session_path("appends")
+        before = session_file.read_bytes()
+        write_opens.clear()
+        
+        storage.add_message("appends", "user", "one")
+        storage.add_message("appends", "assistant", "two")
+        
+        assert write_opens == [session_file, session_file]
+        assert session_file.read_bytes() == before + b"".join(
+            dumps_line(message)
+            for message in (
+                {"role": "user", "content": "one"},
+                {"role": "assistant", "content": "two"},
+            )
+        )
+    
+    def test_session_ids_stay_inside_storage_dir(self, storage):
+        """Test that path-like session ids are quoted into a single file name"""
+        storage.add_message("../escape", "user", "Hi")
+        
+        session_file = storage._session_path("../escape")
+        assert session_file.parent == storage._session_dir()
+        sessions = storage.load_conversations()["conversations"]
+        assert [conv["session_id"] for conv in sessions] == ["../escape"]
+    
+    def test_get_session_is_read_only(self, storage, write_opens):
+        """Test that get_session returns None for unknown ids without writing"""
+        assert storage.get_session("missing") is None
+        assert write_opens == []
+        assert storage.load_conversations() == {"conversations": []}
+    
+    def test_torn_last_line_is_skipped(self, storage, system_prompt):
+        """Test that a partially written final message does not break reads or appends"""
+        storage.add_message("torn", "user", "kept")
+        session_file = storage._session_path("torn")
+        with session_file.open("ab") as f:
+            f.write(b'{"role": "user", "cont')
+        
+        expected = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "kept"},
+        ]
+        assert storage.get_or_create_session("torn")["messages"] == expected
+        assert storage.load_conversations()["conversations"][0]["messages"] == expected
+        
+        storage.add_message("torn", "assistant", "after")
+        messages = storage.get_session("torn")["messages"]
+        assert messages == expected + [{"role": "assistant", "content": "after"}]
+    
+    def test_empty_session_file_is_treated_as_missing(self, storage, system_prompt):
+        """Test that a zero-byte session file reads as absent and is recreated"""
+        session_file = storage._session_path("empty")
+        session_file.write_bytes(b"")
+        
+        assert storage.get_session("empty") is None
+        assert storage.load_conversations() == {"conversations": []}
+        
+        storage.add_message("empty", "user", "Hi")
+        assert storage.get_session("empty")["messages"] == [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "Hi"},
+        ]
+    
+    def test_unreadable_header_is_set_aside_not_overwritten(self, storage, system_prompt):
+        """Test that a torn header keeps the old file and the new message stays visible"""
+        session_file = storage._session_path("x")
+        torn = b'{"session_id": "x", "crea\n{"role": "user", "content": "old"}\n'
+        session_file.write_bytes(torn)
+        
+        storage.add_message("x", "user", "new")
+        
+        assert storage.get_session("x")["messages"] == [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "new"},
+        ]
+        assert storage.get_or_create_session("x")["messages"][-1]["content"] == "new"
+        (set_aside,) = storage._session_dir().glob("x.jsonl.*.corrupt")
+        assert set_aside.read_bytes() == torn
@@ -1,7 +1,7 @@
 """Tests for task manager module."""
 
-import os
-import tempfile
+import copy
+from pathlib import Path
 
 import pytest
 
@@ -9,53 +9,101 @@ from src.tasks.task_manager import TaskManager
 from src.tasks.task_storage import TaskStorage
 
 
-class TestTaskManager:
-    def setup_method(self):
-        self.temp_file = tempfile.NamedTemporaryFile(delete=False)
-        self.temp_file.close()
-        storage = TaskStorage(storage_file=self.temp_file.name)
-        self.manager = TaskManager(storage=storage)
+class _MemStorage:
+    """In-memory stand-in for TaskStorage; copies mimic a JSON round trip."""
+
+    def __init__(self):
+        self._tasks = []
+
+    def get_tasks(self):
+        return copy.deepcopy(self._tasks)
+
+    def write_tasks(self, tasks):
+        self._tasks = copy.deepcopy(tasks)
+
+
+def test_task_storage_persistence(tmp_path):
+    storage_file = tmp_path / "tasks.json"
+    manager = TaskManager(storage=TaskStorage(storage_file=str(storage_file)))
+    task = manager.create_task("Buy groceries", priority="high")
+
+    reloaded = TaskStorage(storage_file=str(storage_file)).get_tasks()
+    assert reloaded == [task]
+
+
+def test_save_is_single_write(tmp_path, monkeypatch):
+    storage_file = tmp_path / "tasks.json"
+    manager = TaskManager(storage=TaskStorage(storage_file=str(storage_file)))
+    writes = []
+    real_open = Path.open
+
+    def spying_open(self, mode="r", *args, **kwargs):
+        handle = real_open(self, mode, *args, **kwargs)
+        if "w" in mode:
+            real_write = handle.write
 
-    def teardown_method(self):
-        os.unlink(self.temp_file.name)
+            def write(data):
+                writes.append(self)
+                return real_write(data)
 
-    def test_create_task_defaults(self):
-        task = self.manager.create_task("Buy groceries")
+            handle.write = write
+        return handle
+
+    monkeypatch.setattr(Path, "open", spying_open)
+
+    manager.create_task("Task A")
+    manager.create_task("Task B")
+
+    # The encoded document goes out in one write() call per save.
+    assert writes == [storage_file, storage_file]
+
+
+@pytest.fixture
+def manager():
+    return TaskManager(storage=_MemStorage())
+
+
+class TestTaskManager:
+    def test_create_task_defaults(self, manager):
+        task = manager.create_task("Buy groceries")
         assert task["title"] == "Buy groceries"
         assert task["priority"] == "normal"
         assert task["status"] == "pending"
 
-    def test_list_tasks_with_filters(self):
-        self.manager.create_task("Task A", priority="low")
-        task_b = self.manager.create_task("Task B", priority="high")
-        self.manager.complete_task(task_b["id"])
+    def test_list_tasks_with_filters(self, manager):
+        manager.create_task("Task A", priority="low")
+        task_b = manager.create_task("Task B", priority="high")
+        manager.complete_task(task_b["id"])
 
-        high_tasks = self.manager.list_tasks(priority="high")
+        high_tasks = manager.list_tasks(priority="high")
         assert len(high_tasks) == 1
         assert high_tasks[0]["title"] == "Task B"
 
-        completed = self.manager.list_tasks(status="completed")
+        completed = manager.list_tasks(status="completed")
         assert len(completed) == 1
 
-    def test_update_task(self):
-        task = self.manager.create_task("Draft email")
-        updated = self.manager.update_task(
-            task["id"], title="Draft longer email", priority="high"
-        )
-        assert updated["title"] == "Draft longer email"
-        assert updated["priority"] == "high"
-
-    def test_delete_task(self):
-        task = self.manager.create_task("Temporary task")
-        self.manager.delete_task(task["id"])
-        remaining = self.manager.list_tasks()
-        assert remaining == []
-
-    def test_complete_task(self):
-        task = self.manager.create_task("Call client")
-        completed = self.manager.complete_task(task["id"])
-        assert completed["status"] == "completed"
-
-    def test_update_invalid_task_raises(self):
+    @pytest.mark.parametrize(
+        "op, kwargs, expected",
+        [
+            (
+                "update_task",
+                {"title": "Draft longer email", "priority": "high"},
+                {"title": "Draft longer email", "priority": "high"},
+            ),
+            ("complete_task", {}, {"status": "completed"}),
+        ],
+        ids=["update", "complete"],
+    )
+    def test_single_task_operation(self, manager, op, kwargs, expected):
+        task = manager.create_task("Draft email")
+        result = getattr(manager, op)(task["id"], **kwargs)
+        assert {key: result[key] for key in expected} == expected
+
+    def test_delete_task(self, manager):
+        task = manager.create_task("Temporary task")
+        manager.delete_task(task["id"])
+        assert manager.list_tasks() == []
+
+    def test_update_invalid_task_raises(self, manager):
         with pytest.raises(ValueError):
-            self.manager.update_task("missing", title="Nope")
+            manager.update_task("missing", title="Nope")
@@ -1,48 +1,258 @@
 """Tests for time utility helpers."""
 
-from datetime import datetime
+from dataclasses import FrozenInstanceError
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import Mock
 
 from src.time_utils import (
     LOCAL_ZONE,
+    _try_parse_iso,
     format_human,
     is_late_hour,
     now_local,
     resolve_time_reference,
 )
 
+# Shared sample moments; datetimes are immutable so tests can reuse them.
+SAMPLE_AFTERNOON = datetime(2025, 11, 25, 15, 45, tzinfo=LOCAL_ZONE)
+EARLY = datetime(2025, 11, 25, 18, 0, tzinfo=LOCAL_ZONE)
+LATE = datetime(2025, 11, 25, 22, 30, tzinfo=LOCAL_ZONE)
+REF_MORNING = datetime(2025, 11, 25, 10, 0, tzinfo=LOCAL_ZONE)
+
 
 def test_format_human_includes_expected_components():
-    sample = datetime(2025, 11, 25, 15, 45, tzinfo=LOCAL_ZONE)
-    human = format_human(sample)
+    human = format_human(SAMPLE_AFTERNOON)
     assert "November" in human
     assert "2025" in human
     assert "15:45" in human
 
 
-def test_is_late_hour_threshold():
-    early = datetime(2025, 11, 25, 18, 0, tzinfo=LOCAL_ZONE)
-    late = datetime(2025, 11, 25, 22, 30, tzinfo=LOCAL_ZONE)
-    assert is_late_hour(early) is False
-    assert is_late_hour(late) is True
+@pytest.mark.parametrize(
+    "moment, expected",
+    [
+        (EARLY, False),
+        (LATE, True),
+    ],
+    ids=["early", "late"],
+)
+def test_is_late_hour_threshold(moment, expected):
+    assert is_late_hour(moment) is expected
+
 
+@pytest.mark.parametrize(
+    "text, reference, iso_prefix, conf_check",
+    [
+        (
+            "2025-11-25T09:30:00+02:00",
+            None,
+            # allow for timezone adjustments
+            ("2025-11-25T07", "2025-11-25T09"),
+            lambda c: c == 1.0,
+        ),
+        (
+            "Tomorrow at 3 pm",
+            REF_MORNING,
+            "2025-11-26T15:00",
+            lambda c: 0.0 < c < 1.0,
+        ),
+        ("someday maybe", None, None, lambda c: c == 0.0),
+    ],
+    ids=["iso", "relative_with_time", "unknown"],
+)
+def test_resolve_time_reference(text, reference, iso_prefix, conf_check):
+    result = resolve_time_reference(text, reference)
+    if iso_prefix is None:
+        assert result.iso is None
+    else:
+        assert result.iso.startswith(iso_prefix)
+    assert conf_check(result.confidence)
 
-def test_resolve_time_reference_iso():
-    result = resolve_time_reference("2025-11-25T09:30:00+02:00")
-    assert result.iso.startswith("2025-11-25T07") or result.iso.startswith(
-        "2025-11-25T09"
-    )  # allow for timezone adjustments
-    assert result.confidence == 1.0
+
+def test_try_parse_iso_reuses_cached_result():
+    _try_parse_iso.cache_clear()
+    first = _try_parse_iso("2025-11-25T09:30:00+02:00")
+    second = _try_parse_iso("2025-11-25T09:30:00+02:00")
+    assert first is second
+    assert _try_parse_iso.cache_info().hits == 1
+
+
+def test_resolve_time_reference_prefers_longest_relative_keyword():
+    result = resolve_time_reference("day after tomorrow", REF_MORNING)
+    assert result.iso.startswith("2025-11-27T09:00")
+
+
+@pytest.mark.parametrize(
+    "phrase, expected_date",
+    [
+        ("not today, tomorrow 3pm", "2025-11-26"),
+        ("today or tomorrow", "2025-11-26"),
+        ("tonight, not tomorrow", "2025-11-26"),
+        ("today after tomorrow", "2025-11-27"),
+    ],
+)
+def test_resolve_time_reference_keyword_priority_beats_position(phrase, expected_date):
+    result = resolve_time_reference(phrase, REF_MORNING)
+    assert result.iso.startswith(expected_date)
+
+
+def test_resolve_time_reference_relative_cache_keys_on_reference_date():
+    later_today = datetime(2025, 11, 25, 16, 0, tzinfo=LOCAL_ZONE)
+    next_day = datetime(2025, 11, 26, 10, 0, tzinfo=LOCAL_ZONE)
+    first = resolve_time_reference("tomorrow 9am", REF_MORNING)
+    assert resolve_time_reference("tomorrow 9am", later_today) is first
+    rolled = resolve_time_reference("tomorrow 9am", next_day)
+    assert rolled.iso.startswith("2025-11-27T09:00")
+
+
+@pytest.mark.parametrize(
+    "phrase, expected",
+    [
+        ("today 12am", "T00:00"),
+        ("today 12pm", "T12:00"),
+        ("today 3PM", "T15:00"),
+        ("today 7:15 am", "T07:15"),
+        ("today 24", "T00:00"),
+        ("today 24pm", "T23:00"),
+        ("today 15am", "T15:00"),
+        ("today 13am", "T13:00"),
+    ],
+)
+def test_resolve_time_reference_twelve_hour_clock(phrase, expected):
+    result = resolve_time_reference(phrase, REF_MORNING)
+    assert expected in result.iso
 
 
-def test_resolve_time_reference_relative_with_time():
-    reference = datetime(2025, 11, 25, 10, 0, tzinfo=LOCAL_ZONE)
-    result = resolve_time_reference("Tomorrow at 3 pm", reference)
-    assert result.iso.startswith("2025-11-26T15:00")
-    assert 0.0 < result.confidence < 1.0
+def test_format_human_ignores_seconds_and_source_zone():
+    sample = datetime(2025, 11, 25, 15, 45, 59, tzinfo=LOCAL_ZONE)
+    as_utc = sample.astimezone(timezone.utc)
+    assert format_human(as_utc) == format_human(sample)
+    assert format_human(sample).endswith("15:45")
+
+
+@pytest.mark.parametrize("phrase, hour", [("today 1am", 1), ("today 3am", 3)])
+def test_resolve_time_reference_uses_offset_for_wall_clock_time(phrase, hour):
+    # 2025-03-28 is a DST switch day for Asia/Jerusalem; each time must carry
+    # the offset that applies at that time, not one per day.
+    reference = datetime(2025, 3, 28, 0, 30, tzinfo=LOCAL_ZONE)
+    expected = datetime(2025, 3, 28, hour, 0, tzinfo=LOCAL_ZONE).isoformat()
+    assert resolve_time_reference(phrase, reference).iso == expected
+
+
+def test_resolve_time_reference_trims_surrounding_whitespace():
+    result = resolve_time_reference("  2025-11-25T09:30:00+02:00\n")
+    assert result.source_text == "2025-11-25T09:30:00+02:00"
+    assert result.confidence == 1.0
 
 
-def test_resolve_time_reference_unknown():
+def test_time_resolution_is_immutable():
     result = resolve_time_reference("someday maybe")
-    assert result.iso is None
-    assert result.confidence == 0.0
+    with pytest.raises(FrozenInstanceError):
+        result.confidence = 1.0
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2025-11",
+        "2025-329",
+        "2025-W48",
+        "20251125",
+        "2025-11-25",
+        "2025-11-25T09",
+        "2025-11-25T0930",
+        "2025-11-25T24:00",
+        "2025-11-25 09:30",
+        "2025-11-25T09:30:00Z",
+        "2025-11-25T09:30:00z",
+        "2025-11-25T09:30:00+0200",
+        "2025-11-25T09:30:00,5",
+        "2025-11-25T09:30:60",
+    ],
+)
+def test_try_parse_iso_fast_path_matches_stdlib(monkeypatch, value):
+    ciso8601 = pytest.importorskip("ciso8601")
+    import src.time_utils as time_utils
+
+    monkeypatch.setattr(time_utils, "_parse_iso_datetime", None)
+    _try_parse_iso.cache_clear()
+    expected = _try_parse_iso(value)
+
+    monkeypatch.setattr(time_utils, "_parse_iso_datetime", ciso8601.parse_datetime)
+    _try_parse_iso.cache_clear()
+    assert _try_parse_iso(value) == expected
+    _try_parse_iso.cache_clear()
+
+
+def test_resolve_time_reference_empty_input():
+    for value in ("", None):
+        result = resolve_time_reference(value)
+        assert result.iso is None
+        assert result.confidence == 0.0
+        assert result.source_text == ""
+
+
+def test_is_late_hour_matches_local_clock_across_dst_switch():
+    start = datetime(2025, 3, 27, 0, 15, tzinfo=timezone.utc)
+    for hours in range(72):
+        moment = start + timedelta(hours=hours)
+        expected = moment.astimezone(LOCAL_ZONE).hour >= 21
+        assert is_late_hour(moment) is expected
+
+
+def test_resolution_uses_precompiled_patterns(monkeypatch):
+    import src.time_utils as time_utils
+
+    class _NoRegex:
+        def __getattr__(self, name):
+            raise AssertionError(f"re.{name} used during resolution")
+
+    # Any per-call re.* use fails; only the pre-bound pattern methods work.
+    monkeypatch.setattr(time_utils, "re", _NoRegex())
+    time_utils._try_parse_iso.cache_clear()
+    time_utils._try_parse_relative_cached.cache_clear()
+    reference = datetime(2031, 1, 7, 10, 0, tzinfo=LOCAL_ZONE)
+    assert resolve_time_reference("tomorrow 4:05pm", reference).iso.startswith(
+        "2031-01-08T16:05"
+    )
+    assert resolve_time_reference("tonight", reference).confidence == 0.7
+    assert resolve_time_reference("2031-01-07T10:00:00+02:00").confidence == 1.0
+    assert resolve_time_reference("someday maybe", reference).iso is None
+
+
+def test_now_local_caches_within_window(monkeypatch):
+    import src.time_utils as time_utils
+
+    clock = Mock(wraps=datetime)
+    monkeypatch.setattr(time_utils, "datetime", clock)
+    monkeypatch.setattr(time_utils, "_now_cache", None)
+
+    first = now_local(max_age=1.0)
+    assert now_local(max_age=1.0) is first
+    assert clock.now.call_count == 1
+
+    now_local()
+    assert clock.now.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "zone_name, transition_utc",
+    [
+        ("America/St_Johns", datetime(2025, 3, 9, 5, 30, tzinfo=timezone.utc)),
+        ("Australia/Adelaide", datetime(2025, 10, 4, 16, 30, tzinfo=timezone.utc)),
+    ],
+)
+def test_is_late_hour_matches_local_clock_across_half_hour_transitions(
+    monkeypatch, zone_name, transition_utc
+):
+    import src.time_utils as time_utils
+    from zoneinfo import ZoneInfo
 
+    zone = ZoneInfo(zone_name)
+    monkeypatch.setattr(time_utils, "_local_zone", lambda: zone)
+    # Half-hour steps across a day either side hit both 21:00 boundaries.
+    for step in range(-48, 48):
+        moment = transition_utc + timedelta(minutes=30 * step)
+        expected = moment.astimezone(zone).hour >= 21
+        assert is_late_hour(moment) is expected